@@ -5,10 +5,18 @@ Provides tools to fetch real-time and historical cryptocurrency data using CCXT.
 """
 
 import asyncio
+import functools
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import re
+import socket
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Awaitable, Callable
+import aiohttp
 import ccxt.async_support as ccxt
+import ccxt.pro as ccxtpro
+import numpy as np
+import orjson
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 import mcp.server.stdio
@@ -18,8 +26,64 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Cache configuration
-CACHE_DURATION_SECONDS = 60
-price_cache: Dict[str, Dict[str, Any]] = {}
+# Entries younger than CACHE_FRESH_SECONDS are served as-is; older entries are
+# served while a background refresh runs, until CACHE_STALE_SECONDS
+CACHE_FRESH_SECONDS = 30
+CACHE_STALE_SECONDS = 120
+MAX_CACHE_ENTRIES = 1024
+price_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+ohlcv_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+# Unified ccxt symbol, e.g. BTC/USDT, BTC/USDT:USDT or BTC/USDT:USDT-250627;
+# only used until markets are loaded
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{1,20}/[A-Z0-9]{1,20}(?::[A-Z0-9]{1,20}(?:-[A-Z0-9-]+)?)?$")
+INVALID_SYMBOL_ERROR = "Error: Invalid symbol '{symbol}'. Please use format like BTC/USDT, ETH/USDT"
+
+# Maximum number of symbols kept warm by WebSocket ticker streams
+MAX_TICKER_STREAMS = 50
+
+# Maximum number of symbols per get_current_prices call
+MAX_BATCH_SYMBOLS = 100
+
+# Connection pool configuration
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 20
+POOL_KEEPALIVE_SECONDS = 75
+
+# Significant digits kept for OHLCV prices and volumes
+OHLCV_SIGNIFICANT_DIGITS = 8
+
+
+def _error_wrapped(label: str):
+    """
+    Decorate an exchange fetch so failures become user-facing error messages.
+    
+    Args:
+        label: What is being fetched, used in the unexpected-error message
+    """
+    def decorator(fetch: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        @functools.wraps(fetch)
+        async def wrapper(self, symbol: str, *args, **kwargs) -> str:
+            try:
+                return await fetch(self, symbol, *args, **kwargs)
+            
+            except ccxt.BadSymbol:
+                error_msg = INVALID_SYMBOL_ERROR.format(symbol=symbol)
+                logger.warning(error_msg)
+                return error_msg
+            
+            except ccxt.NetworkError as e:
+                error_msg = f"Network error: {str(e)}"
+                logger.error(error_msg)
+                return error_msg
+            
+            except Exception as e:
+                error_msg = f"Unexpected error fetching {label} for {symbol}: {str(e)}"
+                logger.exception(error_msg)
+                return error_msg
+        
+        return wrapper
+    return decorator
 
 
 class CryptoMCPServer:
@@ -27,84 +91,141 @@ class CryptoMCPServer:
     
     def __init__(self):
         self.server = Server("crypto-mcp-server")
-        self.exchange = ccxt.binance()
+        self.exchange = ccxtpro.binance({"aiohttp_trust_env": False})
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Requested symbols are kept fresh by WebSocket ticker streams
+        self._ticker_streams: Dict[str, asyncio.Task] = {}
+        # Last time a streamed symbol was read; idle streams stop themselves
+        self._stream_last_read: Dict[str, float] = {}
+        # Tasks for fetches in progress, shared by concurrent callers
+        self._inflight_ticker: Dict[str, asyncio.Task] = {}
+        self._inflight_ohlcv: Dict[tuple, asyncio.Task] = {}
+        # Background cache refreshes, one per symbol
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._tools = self._build_tools()
+        # Tool name -> coroutine function taking the call arguments
+        self._dispatch: Dict[str, Callable[[dict], Awaitable[list[TextContent]]]] = {
+            "get_current_price": self._call_current_price,
+            "get_current_prices": self._call_current_prices,
+            "get_historical_price": self._call_historical_price
+        }
         self._setup_handlers()
     
+    @staticmethod
+    def _build_tools() -> list[Tool]:
+        """Build the tool descriptors advertised by the server."""
+        return [
+            Tool(
+                name="get_current_price",
+                description="Get the current real-time price of a cryptocurrency pair. "
+                            "Results are cached and refreshed in the background after 30 seconds. "
+                            "Example symbols: BTC/USDT, ETH/USDT, SOL/USDT",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "symbol": {
+                            "type": "string",
+                            "description": "Trading pair symbol (e.g., BTC/USDT, ETH/USDT)"
+                        }
+                    },
+                    "required": ["symbol"]
+                }
+            ),
+            Tool(
+                name="get_current_prices",
+                description="Get the current real-time prices of several cryptocurrency pairs "
+                            "in one call. Returns one result per symbol, in request order. "
+                            "Results are cached and refreshed in the background after 30 seconds. "
+                            "Example symbols: BTC/USDT, ETH/USDT, SOL/USDT",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "symbols": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Trading pair symbols (e.g., [\"BTC/USDT\", \"ETH/USDT\"])",
+                            "maxItems": MAX_BATCH_SYMBOLS
+                        }
+                    },
+                    "required": ["symbols"]
+                }
+            ),
+            Tool(
+                name="get_historical_price",
+                description="Get historical OHLCV (Open, High, Low, Close, Volume) data "
+                            "for a cryptocurrency pair. Returns the most recent candles. "
+                            "Example symbols: BTC/USDT, ETH/USDT, SOL/USDT",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "symbol": {
+                            "type": "string",
+                            "description": "Trading pair symbol (e.g., BTC/USDT, ETH/USDT)"
+                        },
+                        "timeframe": {
+                            "type": "string",
+                            "description": "Timeframe for candles (e.g., 1m, 5m, 1h, 1d)",
+                            "default": "1h"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Number of candles to retrieve (max 500)",
+                            "default": 10
+                        }
+                    },
+                    "required": ["symbol"]
+                }
+            )
+        ]
+    
     def _setup_handlers(self):
         """Set up request handlers for the MCP server."""
         
         @self.server.list_tools()
         async def list_tools() -> list[Tool]:
             """List available tools."""
-            return [
-                Tool(
-                    name="get_current_price",
-                    description="Get the current real-time price of a cryptocurrency pair. "
-                                "Results are cached for 60 seconds. "
-                                "Example symbols: BTC/USDT, ETH/USDT, SOL/USDT",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "symbol": {
-                                "type": "string",
-                                "description": "Trading pair symbol (e.g., BTC/USDT, ETH/USDT)"
-                            }
-                        },
-                        "required": ["symbol"]
-                    }
-                ),
-                Tool(
-                    name="get_historical_price",
-                    description="Get historical OHLCV (Open, High, Low, Close, Volume) data "
-                                "for a cryptocurrency pair. Returns the most recent candles. "
-                                "Example symbols: BTC/USDT, ETH/USDT, SOL/USDT",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "symbol": {
-                                "type": "string",
-                                "description": "Trading pair symbol (e.g., BTC/USDT, ETH/USDT)"
-                            },
-                            "timeframe": {
-                                "type": "string",
-                                "description": "Timeframe for candles (e.g., 1m, 5m, 1h, 1d)",
-                                "default": "1h"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of candles to retrieve (max 500)",
-                                "default": 10
-                            }
-                        },
-                        "required": ["symbol"]
-                    }
-                )
-            ]
+            return self._tools
         
         @self.server.call_tool()
         async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             """Handle tool calls."""
             try:
-                if name == "get_current_price":
-                    result = await self.get_current_price(arguments.get("symbol"))
-                    return [TextContent(type="text", text=result)]
-                
-                elif name == "get_historical_price":
-                    result = await self.get_historical_price(
-                        symbol=arguments.get("symbol"),
-                        timeframe=arguments.get("timeframe", "1h"),
-                        limit=arguments.get("limit", 10)
-                    )
-                    return [TextContent(type="text", text=result)]
-                
-                else:
+                handler = self._dispatch.get(name)
+                if handler is None:
                     raise ValueError(f"Unknown tool: {name}")
+                
+                return await handler(arguments)
             
             except Exception as e:
                 error_msg = f"Error executing {name}: {str(e)}"
                 logger.error(error_msg)
                 return [TextContent(type="text", text=error_msg)]
     
+    async def _call_current_price(self, arguments: dict) -> list[TextContent]:
+        """Handle a get_current_price call, reusing cached content on a hit."""
+        symbol = arguments.get("symbol")
+        if symbol:
+            cached_data = self._get_cached_price(self._normalize_symbol(symbol))
+            if cached_data is not None:
+                return [cached_data["response"]]
+        
+        result = await self.get_current_price(symbol)
+        return [TextContent(type="text", text=result)]
+    
+    async def _call_current_prices(self, arguments: dict) -> list[TextContent]:
+        """Handle a get_current_prices call, one content item per symbol."""
+        results = await self.get_current_prices(arguments.get("symbols"))
+        return [TextContent(type="text", text=result) for result in results]
+    
+    async def _call_historical_price(self, arguments: dict) -> list[TextContent]:
+        """Handle a get_historical_price call."""
+        result = await self.get_historical_price(
+            symbol=arguments.get("symbol"),
+            timeframe=arguments.get("timeframe", "1h"),
+            limit=arguments.get("limit", 10)
+        )
+        return [TextContent(type="text", text=result)]
+    
     async def get_current_price(self, symbol: Optional[str]) -> str:
         """
         Get current price for a cryptocurrency pair with caching.
@@ -118,61 +239,150 @@ class CryptoMCPServer:
         if not symbol:
             return "Error: Symbol is required"
         
-        # Normalize symbol
-        symbol = symbol.upper().strip()
+        symbol = self._normalize_symbol(symbol)
+        if not self._is_valid_symbol(symbol):
+            return INVALID_SYMBOL_ERROR.format(symbol=symbol)
         
         # Check cache
-        if symbol in price_cache:
-            cached_data = price_cache[symbol]
-            cache_time = cached_data["timestamp"]
-            if datetime.now() - cache_time < timedelta(seconds=CACHE_DURATION_SECONDS):
-                logger.info(f"Cache hit for {symbol}")
-                return cached_data["data"]
+        cached_data = self._get_cached_price(symbol)
+        if cached_data is not None:
+            return cached_data["data"]
         
-        try:
-            # Fetch ticker data
-            ticker = await self.exchange.fetch_ticker(symbol)
-            
-            # Format response
-            result = {
-                "symbol": symbol,
-                "price": ticker["last"],
-                "bid": ticker["bid"],
-                "ask": ticker["ask"],
-                "high_24h": ticker["high"],
-                "low_24h": ticker["low"],
-                "volume_24h": ticker["baseVolume"],
-                "change_24h": ticker["change"],
-                "change_percent_24h": ticker["percentage"],
-                "timestamp": ticker["timestamp"],
-                "datetime": ticker["datetime"]
-            }
-            
-            result_str = self._format_dict(result)
-            
-            # Update cache
-            price_cache[symbol] = {
-                "data": result_str,
-                "timestamp": datetime.now()
-            }
-            
-            logger.info(f"Fetched current price for {symbol}")
-            return result_str
+        return await self._refresh_price(symbol)
+    
+    async def get_current_prices(self, symbols: Optional[list[str]]) -> list[str]:
+        """
+        Get current prices for several cryptocurrency pairs concurrently.
+        
+        Args:
+            symbols: Trading pair symbols (e.g., ["BTC/USDT", "ETH/USDT"])
         
-        except ccxt.BadSymbol:
-            error_msg = f"Error: Invalid symbol '{symbol}'. Please use format like BTC/USDT, ETH/USDT"
-            logger.warning(error_msg)
-            return error_msg
+        Returns:
+            JSON string with price data or error message for each symbol, in order
+        """
+        if not symbols:
+            return ["Error: Symbols are required"]
+        
+        if not isinstance(symbols, list):
+            return ["Error: Symbols must be a list"]
+        
+        if len(symbols) > MAX_BATCH_SYMBOLS:
+            return [f"Error: At most {MAX_BATCH_SYMBOLS} symbols can be requested at once"]
+        
+        results = await asyncio.gather(
+            *[self.get_current_price(symbol) for symbol in symbols],
+            return_exceptions=True
+        )
+        
+        return [
+            f"Unexpected error fetching price for {symbol}: {str(result)}"
+            if isinstance(result, BaseException) else result
+            for symbol, result in zip(symbols, results)
+        ]
+    
+    def _get_cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the usable cache entry for a normalized symbol, if any.
+        
+        Stale entries are still returned, after scheduling a background refresh.
+        """
+        cached_data = price_cache.get(symbol)
+        if cached_data is None:
+            return None
+        
+        age = time.monotonic() - cached_data["timestamp"]
+        if age >= CACHE_STALE_SECONDS:
+            return None
+        if age >= CACHE_FRESH_SECONDS and symbol not in self._refresh_tasks:
+            task = asyncio.create_task(self._refresh_price(symbol))
+            self._refresh_tasks[symbol] = task
+            task.add_done_callback(lambda _: self._refresh_tasks.pop(symbol, None))
+        
+        price_cache.move_to_end(symbol)
+        if symbol in self._ticker_streams:
+            self._stream_last_read[symbol] = time.monotonic()
+        logger.info("Cache hit for %s", symbol)
+        return cached_data
+    
+    async def _refresh_price(self, symbol: str) -> str:
+        """Fetch a symbol's price, joining a fetch already in progress."""
+        return await self._coalesce(
+            self._inflight_ticker,
+            symbol,
+            lambda: self._fetch_current_price(symbol)
+        )
+    
+    def _cache_ticker(self, symbol: str, ticker: dict) -> str:
+        """Format a ticker and store it in the price cache."""
+        # Format response
+        result = {
+            "symbol": symbol,
+            "price": ticker["last"],
+            "bid": ticker["bid"],
+            "ask": ticker["ask"],
+            "high_24h": ticker["high"],
+            "low_24h": ticker["low"],
+            "volume_24h": ticker["baseVolume"],
+            "change_24h": ticker["change"],
+            "change_percent_24h": ticker["percentage"],
+            "timestamp": ticker["timestamp"],
+            "datetime": ticker["datetime"]
+        }
         
-        except ccxt.NetworkError as e:
-            error_msg = f"Network error: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+        result_str = self._format_dict(result)
         
+        # Update cache
+        self._store_cached(price_cache, symbol, {
+            "data": result_str,
+            "response": TextContent(type="text", text=result_str),
+            "timestamp": time.monotonic()
+        })
+        
+        return result_str
+    
+    def _start_ticker_stream(self, symbol: str):
+        """Start streaming a symbol's ticker into the cache, if not already streaming."""
+        if symbol in self._ticker_streams:
+            return
+        if len(self._ticker_streams) >= MAX_TICKER_STREAMS:
+            return
+        self._stream_last_read[symbol] = time.monotonic()
+        self._ticker_streams[symbol] = asyncio.create_task(self._ticker_loop(symbol))
+    
+    async def _ticker_loop(self, symbol: str):
+        """
+        Write WebSocket ticker updates for a symbol into the price cache.
+        
+        Runs until cancelled, the stream fails, or the symbol goes unread for
+        CACHE_STALE_SECONDS or is evicted from the cache. Once it stops, the cache
+        entry expires normally and the next request falls back to a REST fetch.
+        """
+        try:
+            while True:
+                ticker = await self.exchange.watch_ticker(symbol)
+                idle = time.monotonic() - self._stream_last_read.get(symbol, 0)
+                if idle >= CACHE_STALE_SECONDS or symbol not in price_cache:
+                    logger.info("Ticker stream for %s idle, unsubscribing", symbol)
+                    await self.exchange.un_watch_ticker(symbol)
+                    break
+                self._cache_ticker(symbol, ticker)
         except Exception as e:
-            error_msg = f"Unexpected error fetching price for {symbol}: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+            logger.warning("Ticker stream for %s stopped: %s", symbol, e)
+        finally:
+            self._ticker_streams.pop(symbol, None)
+            self._stream_last_read.pop(symbol, None)
+    
+    @_error_wrapped("price")
+    async def _fetch_current_price(self, symbol: str) -> str:
+        """Fetch current price from the exchange and update the cache."""
+        # Fetch ticker data
+        ticker = await self.exchange.fetch_ticker(symbol)
+        
+        result_str = self._cache_ticker(symbol, ticker)
+        self._start_ticker_stream(symbol)
+        
+        logger.info("Fetched current price for %s", symbol)
+        return result_str
     
     async def get_historical_price(
         self, 
@@ -194,73 +404,226 @@ class CryptoMCPServer:
         if not symbol:
             return "Error: Symbol is required"
         
-        # Normalize symbol
-        symbol = symbol.upper().strip()
+        symbol = self._normalize_symbol(symbol)
+        if not self._is_valid_symbol(symbol):
+            return INVALID_SYMBOL_ERROR.format(symbol=symbol)
         
         # Validate limit
         if limit < 1 or limit > 500:
             return "Error: Limit must be between 1 and 500"
         
+        # Check cache
+        cache_key = (symbol, timeframe, limit)
+        if cache_key in ohlcv_cache:
+            cached_data = ohlcv_cache[cache_key]
+            if time.monotonic() < cached_data["expires"]:
+                ohlcv_cache.move_to_end(cache_key)
+                logger.info("Cache hit for %s (%s)", symbol, timeframe)
+                return cached_data["data"]
+        
+        return await self._coalesce(
+            self._inflight_ohlcv,
+            cache_key,
+            lambda: self._fetch_historical_price(symbol, timeframe, limit)
+        )
+    
+    @_error_wrapped("historical data")
+    async def _fetch_historical_price(self, symbol: str, timeframe: str, limit: int) -> str:
+        """Fetch OHLCV data from the exchange and update the cache."""
+        # Cache for CACHE_FRESH_SECONDS, or less if the current bar closes
+        # sooner, since the newest candle is still forming
+        ttl = CACHE_FRESH_SECONDS
         try:
-            # Fetch OHLCV data
-            ohlcv = await self.exchange.fetch_ohlcv(
-                symbol=symbol,
-                timeframe=timeframe,
-                limit=limit
-            )
-            
-            # Format response
-            candles = []
-            for candle in ohlcv:
-                candles.append({
-                    "timestamp": candle[0],
-                    "datetime": datetime.fromtimestamp(candle[0] / 1000).isoformat(),
-                    "open": candle[1],
-                    "high": candle[2],
-                    "low": candle[3],
-                    "close": candle[4],
-                    "volume": candle[5]
-                })
-            
-            result = {
-                "symbol": symbol,
-                "timeframe": timeframe,
-                "count": len(candles),
-                "candles": candles
-            }
-            
-            logger.info(f"Fetched {len(candles)} candles for {symbol} ({timeframe})")
-            return self._format_dict(result)
+            interval = self.exchange.parse_timeframe(timeframe)
+            ttl = min(interval - time.time() % interval, ttl)
+        except Exception:
+            # Unknown timeframes are left for fetch_ohlcv to report
+            pass
         
-        except ccxt.BadSymbol:
-            error_msg = f"Error: Invalid symbol '{symbol}'. Please use format like BTC/USDT, ETH/USDT"
-            logger.warning(error_msg)
-            return error_msg
+        # Fetch OHLCV data
+        ohlcv = await self.exchange.fetch_ohlcv(
+            symbol=symbol,
+            timeframe=timeframe,
+            limit=limit
+        )
         
-        except ccxt.NetworkError as e:
-            error_msg = f"Network error: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+        # Format response
+        candles = self._format_candles(ohlcv)
         
-        except Exception as e:
-            error_msg = f"Unexpected error fetching historical data for {symbol}: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+        result = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "count": len(candles),
+            "candles": candles
+        }
+        
+        result_str = self._format_dict(result)
+        
+        # Update cache
+        self._store_cached(ohlcv_cache, (symbol, timeframe, limit), {
+            "data": result_str,
+            "expires": time.monotonic() + ttl
+        })
+        
+        logger.info("Fetched %d candles for %s (%s)", len(candles), symbol, timeframe)
+        return result_str
+    
+    @staticmethod
+    def _normalize_symbol(symbol: str) -> str:
+        """Uppercase and strip a symbol, skipping the copies if already normalized."""
+        if symbol[0] > " " and symbol[-1] > " " and symbol.isupper():
+            return symbol
+        return symbol.strip().upper()
+    
+    def _is_valid_symbol(self, symbol: str) -> bool:
+        """Check a normalized symbol locally, before any request is made."""
+        markets = self.exchange.markets
+        if markets is not None:
+            return symbol in markets
+        return SYMBOL_PATTERN.match(symbol) is not None
+    
+    @staticmethod
+    def _store_cached(cache: OrderedDict, key: Any, entry: Dict[str, Any]):
+        """Insert a cache entry, evicting the least recently used beyond the limit."""
+        cache[key] = entry
+        cache.move_to_end(key)
+        if len(cache) > MAX_CACHE_ENTRIES:
+            cache.popitem(last=False)
+    
+    @staticmethod
+    async def _coalesce(
+        inflight: Dict[Any, asyncio.Task],
+        key: Any,
+        fetch: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Run a fetch, sharing its result with concurrent callers for the same key.
+        
+        The fetch runs in its own task, so cancelling any one caller (including
+        the one that started it) does not cancel the others.
+        
+        Args:
+            inflight: Map of keys to tasks for fetches in progress
+            key: Cache key identifying the request
+            fetch: Zero-argument coroutine function performing the fetch
+        
+        Returns:
+            Result of the shared fetch
+        """
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    @staticmethod
+    def _format_candles(ohlcv: list) -> list[dict]:
+        """
+        Convert raw OHLCV rows into candle dictionaries.
+        
+        Columns are converted in bulk with NumPy, so datetimes are rendered
+        in UTC without building a datetime object per row. Prices and volumes
+        are rounded to OHLCV_SIGNIFICANT_DIGITS to keep the payload compact.
+        
+        Args:
+            ohlcv: Rows of [timestamp_ms, open, high, low, close, volume]
+        
+        Returns:
+            List of candle dictionaries
+        """
+        arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        ts_ms = arr[:, 0].astype(np.int64)
+        dt = np.datetime_as_string(ts_ms.view("datetime64[ms]"), unit="s")
+        
+        # Round to significant digits by scaling each value to an integer. Exact
+        # powers of ten are only used as divisors for fractions and multipliers
+        # for large values, so results are the nearest doubles to the decimals.
+        values = arr[:, 1:]
+        with np.errstate(divide="ignore"):
+            magnitude = np.floor(np.log10(np.abs(values)))
+        decimals = np.clip(OHLCV_SIGNIFICANT_DIGITS - 1 - np.nan_to_num(magnitude, neginf=0), -22, 22)
+        scale = 10.0 ** np.abs(decimals)
+        values = np.where(
+            decimals >= 0,
+            np.round(values * scale) / scale,
+            np.round(values / scale) * scale
+        )
+        
+        return [
+            {
+                "timestamp": ts,
+                "datetime": iso,
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": v
+            }
+            for ts, iso, o, h, l, c, v in zip(
+                ts_ms.tolist(), dt.tolist(), *values.T.tolist()
+            )
+        ]
     
     @staticmethod
     def _format_dict(data: dict) -> str:
         """Format dictionary as a readable string."""
-        import json
-        return json.dumps(data, indent=2)
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    
+    def _open_session(self):
+        """Create a pooled HTTP session and share it with the exchange."""
+        # Let ccxt build its SSL context (certifi bundle, verify/cafile options)
+        # without creating a session of its own
+        self.exchange.own_session = False
+        self.exchange.open()
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            keepalive_timeout=POOL_KEEPALIVE_SECONDS,
+            ssl=self.exchange.ssl_context,
+            enable_cleanup_closed=True,
+            family=socket.AF_UNSPEC,
+            happy_eyeballs_delay=0
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            trust_env=self.exchange.aiohttp_trust_env
+        )
+        # ccxt leaves sessions it does not own open, so cleanup() closes it
+        self.exchange.session = self._session
+    
+    async def _load_markets(self):
+        """Load exchange markets up front so the first request skips that round-trip."""
+        try:
+            await self.exchange.load_markets()
+            logger.info("Loaded %d markets", len(self.exchange.markets))
+        except ccxt.BaseError as e:
+            # Markets are loaded lazily by the first request instead
+            logger.warning("Could not preload markets: %s", e)
     
     async def cleanup(self):
         """Clean up resources."""
+        streams = [
+            *self._ticker_streams.values(),
+            *self._refresh_tasks.values(),
+            *self._inflight_ticker.values(),
+            *self._inflight_ohlcv.values()
+        ]
+        for task in streams:
+            task.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
         await self.exchange.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         logger.info("Exchange connection closed")
     
     async def run(self):
         """Run the MCP server."""
         try:
+            # The connector needs a running event loop, so it is created here
+            self._open_session()
+            await self._load_markets()
             async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
                 logger.info("Crypto MCP Server started")
                 await self.server.run(
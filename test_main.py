@@ -3,18 +3,22 @@ Test suite for the Cryptocurrency MCP Server.
 Run with: pytest test_main.py -v
 """
 
+import json
 import pytest
 import asyncio
-from datetime import datetime, timedelta
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 import ccxt.async_support as ccxt
-from main import CryptoMCPServer, price_cache
+from mcp import types
+from main import CryptoMCPServer, price_cache, ohlcv_cache
 
 
 @pytest.fixture
 def server():
-    """Fixture to create a fresh server instance for each test."""
-    return CryptoMCPServer()
+    """Fixture to create a fresh server instance for each test, without ticker streams."""
+    server = CryptoMCPServer()
+    with patch.object(server, '_start_ticker_stream'):
+        yield server
 
 
 @pytest.fixture
@@ -47,10 +51,12 @@ def mock_ohlcv():
 
 @pytest.fixture(autouse=True)
 def clear_cache():
-    """Clear the cache before each test."""
+    """Clear the caches before each test."""
     price_cache.clear()
+    ohlcv_cache.clear()
     yield
     price_cache.clear()
+    ohlcv_cache.clear()
 
 
 class TestGetCurrentPrice:
@@ -80,6 +86,46 @@ class TestGetCurrentPrice:
             assert "Error" in result
             assert "Invalid symbol" in result
     
+    @pytest.mark.asyncio
+    async def test_malformed_symbol(self, server):
+        """Test that malformed symbols are rejected without an API call."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            for symbol in ["BTCUSDT", "BTC/USDT/ETH", "BTC-USDT", "/USDT"]:
+                result = await server.get_current_price(symbol)
+                assert "Invalid symbol" in result
+            
+            mock_fetch.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_unknown_market(self, server, mock_ticker):
+        """Test that symbols missing from loaded markets are rejected locally."""
+        server.exchange.markets = {"BTC/USDT": {}}
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ticker
+            
+            result = await server.get_current_price("DOGE/BTC")
+            assert "Invalid symbol 'DOGE/BTC'" in result
+            mock_fetch.assert_not_called()
+            
+            result = await server.get_current_price("BTC/USDT")
+            assert "45000" in result
+    
+    @pytest.mark.asyncio
+    async def test_dated_contract_symbol(self, server, mock_ticker):
+        """Test that dated derivative symbols are accepted, with or without markets."""
+        symbol = "BTC/USDT:USDT-250627"
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ticker
+            
+            result = await server.get_current_price(symbol)
+            assert "45000" in result
+            
+            price_cache.clear()
+            server.exchange.markets = {symbol: {}}
+            result = await server.get_current_price(symbol)
+            assert "45000" in result
+            assert mock_fetch.call_count == 2
+    
     @pytest.mark.asyncio
     async def test_missing_symbol(self, server):
         """Test fetching current price without a symbol."""
@@ -109,7 +155,7 @@ class TestGetCurrentPrice:
     
     @pytest.mark.asyncio
     async def test_cache_expiry(self, server, mock_ticker):
-        """Test that cache expires after the configured duration."""
+        """Test that cache expires after the stale duration."""
         with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
             mock_fetch.return_value = mock_ticker
             
@@ -118,12 +164,34 @@ class TestGetCurrentPrice:
             assert mock_fetch.call_count == 1
             
             # Manually expire the cache
-            price_cache["BTC/USDT"]["timestamp"] = datetime.now() - timedelta(seconds=61)
+            price_cache["BTC/USDT"]["timestamp"] -= 121
             
             # Second call - should hit the API again
             result2 = await server.get_current_price("BTC/USDT")
             assert mock_fetch.call_count == 2
     
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, server, mock_ticker):
+        """Test that stale entries are served while refreshed in the background."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ticker
+            
+            await server.get_current_price("BTC/USDT")
+            price_cache["BTC/USDT"]["timestamp"] -= 31
+            
+            # Stale hit - served from cache, refresh scheduled once
+            mock_fetch.return_value = {**mock_ticker, "last": 46000.00}
+            result = await server.get_current_price("BTC/USDT")
+            await server.get_current_price("BTC/USDT")
+            assert "45000" in result
+            assert mock_fetch.call_count == 1
+            
+            await asyncio.gather(*server._refresh_tasks.values())
+            assert mock_fetch.call_count == 2
+            
+            result = await server.get_current_price("BTC/USDT")
+            assert "46000" in result
+    
     @pytest.mark.asyncio
     async def test_symbol_normalization(self, server, mock_ticker):
         """Test that symbols are normalized to uppercase."""
@@ -135,6 +203,10 @@ class TestGetCurrentPrice:
             # Should be normalized to uppercase
             mock_fetch.assert_called_once_with("BTC/USDT")
             assert "BTC/USDT" in result
+            
+            # Surrounding whitespace is stripped, so this is a cache hit
+            await server.get_current_price("  BTC/USDT\n")
+            assert mock_fetch.call_count == 1
     
     @pytest.mark.asyncio
     async def test_network_error(self, server):
@@ -146,6 +218,91 @@ class TestGetCurrentPrice:
             
             assert "Network error" in result
             assert "timeout" in result.lower()
+    
+    @pytest.mark.asyncio
+    async def test_unexpected_error(self, server):
+        """Test handling of unexpected errors."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = KeyError("last")
+            
+            result = await server.get_current_price("BTC/USDT")
+            
+            assert result.startswith("Unexpected error fetching price for BTC/USDT")
+            assert "BTC/USDT" not in price_cache
+
+
+class TestGetCurrentPrices:
+    """Tests for the get_current_prices tool."""
+    
+    @pytest.mark.asyncio
+    async def test_multiple_symbols(self, server, mock_ticker):
+        """Test fetching several symbols returns one result per symbol in order."""
+        async def fetch(symbol):
+            return {**mock_ticker, "symbol": symbol}
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = fetch
+            
+            results = await server.get_current_prices(["BTC/USDT", "eth/usdt"])
+            
+            assert len(results) == 2
+            assert json.loads(results[0])["symbol"] == "BTC/USDT"
+            assert json.loads(results[1])["symbol"] == "ETH/USDT"
+            assert mock_fetch.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_partial_failure(self, server, mock_ticker):
+        """Test that an invalid symbol does not fail the whole batch."""
+        async def fetch(symbol):
+            if symbol == "INVALID/PAIR":
+                raise ccxt.BadSymbol("Invalid symbol")
+            return mock_ticker
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = fetch
+            
+            results = await server.get_current_prices(["BTC/USDT", "INVALID/PAIR"])
+            
+            assert "45000" in results[0]
+            assert "Invalid symbol" in results[1]
+    
+    @pytest.mark.asyncio
+    async def test_missing_symbols(self, server):
+        """Test fetching prices without any symbols."""
+        results = await server.get_current_prices([])
+        
+        assert len(results) == 1
+        assert "required" in results[0].lower()
+    
+    @pytest.mark.asyncio
+    async def test_symbols_not_a_list(self, server):
+        """Test that a single string is rejected rather than split into characters."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            results = await server.get_current_prices("BTC/USDT")
+            
+            assert results == ["Error: Symbols must be a list"]
+            mock_fetch.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_symbol(self, server):
+        """Test that a cancelled lookup is reported as an error string."""
+        async def lookup(symbol):
+            if symbol == "ETH/USDT":
+                raise asyncio.CancelledError()
+            return "ok"
+        
+        with patch.object(server, 'get_current_price', side_effect=lookup):
+            results = await server.get_current_prices(["BTC/USDT", "ETH/USDT"])
+            
+            assert results[0] == "ok"
+            assert results[1].startswith("Unexpected error fetching price for ETH/USDT")
+    
+    @pytest.mark.asyncio
+    async def test_too_many_symbols(self, server):
+        """Test that the batch size is limited."""
+        results = await server.get_current_prices(["BTC/USDT"] * 101)
+        
+        assert "At most 100" in results[0]
 
 
 class TestGetHistoricalPrice:
@@ -186,6 +343,15 @@ class TestGetHistoricalPrice:
             assert "Error" in result
             assert "Invalid symbol" in result
     
+    @pytest.mark.asyncio
+    async def test_malformed_symbol(self, server):
+        """Test that malformed symbols are rejected without an API call."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            result = await server.get_historical_price("BTCUSDT")
+            
+            assert "Invalid symbol" in result
+            mock_fetch.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_missing_symbol(self, server):
         """Test fetching historical data without a symbol."""
@@ -222,6 +388,102 @@ class TestGetHistoricalPrice:
             assert "close" in result
             assert "volume" in result
             assert "datetime" in result
+            
+            data = json.loads(result)
+            assert data["count"] == 3
+            assert data["candles"][0] == {
+                "timestamp": 1704067200000,
+                "datetime": "2024-01-01T00:00:00",
+                "open": 45000,
+                "high": 45500,
+                "low": 44500,
+                "close": 45200,
+                "volume": 100.5
+            }
+            assert [candle["datetime"] for candle in data["candles"]] == [
+                "2024-01-01T00:00:00",
+                "2024-01-01T01:00:00",
+                "2024-01-01T02:00:00"
+            ]
+    
+    @pytest.mark.asyncio
+    async def test_ohlcv_rounding(self, server):
+        """Test that prices and volumes are rounded to 8 significant digits."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = [
+                [1704067200000, 45000.123456789, 0.1 + 0.2, 0.000012345678912, 1234567891234.5, 123456789.123],
+                [1704070800000, 0, 1, 99999999.99, 100000000, 0.5]
+            ]
+            
+            result = await server.get_historical_price("BTC/USDT", "1h", 2)
+            
+            candle, edge = json.loads(result)["candles"]
+            assert candle["open"] == 45000.123
+            assert candle["high"] == 0.3
+            assert candle["low"] == 0.000012345679
+            # Values of 1e8 and above lose integer digits too
+            assert candle["close"] == 1234567900000
+            assert candle["volume"] == 123456790
+            assert [edge["open"], edge["high"], edge["low"], edge["close"], edge["volume"]] == [
+                0, 1, 100000000, 100000000, 0.5
+            ]
+    
+    @pytest.mark.asyncio
+    async def test_caching(self, server, mock_ohlcv):
+        """Test that historical data is cached per symbol, timeframe and limit."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ohlcv
+            
+            result1 = await server.get_historical_price("BTC/USDT", "1h", 3)
+            result2 = await server.get_historical_price("BTC/USDT", "1h", 3)
+            assert mock_fetch.call_count == 1
+            assert result1 == result2
+            
+            # Different timeframe - should hit the API
+            await server.get_historical_price("BTC/USDT", "1m", 3)
+            assert mock_fetch.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_cache_ttl_follows_timeframe(self, server, mock_ohlcv):
+        """Test that cache entries expire by the bar close, capped for forming candles."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ohlcv
+            
+            # 1s is supported by the exchange, so it must not fall back to a long TTL
+            await server.get_historical_price("BTC/USDT", "1s", 3)
+            await server.get_historical_price("BTC/USDT", "1d", 3)
+            
+            now = time.monotonic()
+            assert ohlcv_cache[("BTC/USDT", "1s", 3)]["expires"] - now <= 1
+            assert ohlcv_cache[("BTC/USDT", "1d", 3)]["expires"] - now <= 30
+    
+    @pytest.mark.asyncio
+    async def test_unparseable_timeframe(self, server, mock_ohlcv):
+        """Test that a timeframe ccxt cannot parse still caches a successful fetch."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch, \
+                patch.object(server.exchange, 'parse_timeframe', side_effect=ccxt.NotSupported("unit")):
+            mock_fetch.return_value = mock_ohlcv
+            
+            result = await server.get_historical_price("BTC/USDT", "1x", 3)
+            
+            assert "candles" in result
+            expires = ohlcv_cache[("BTC/USDT", "1x", 3)]["expires"]
+            assert 0 < expires - time.monotonic() <= 30
+    
+    @pytest.mark.asyncio
+    async def test_cache_expiry(self, server, mock_ohlcv):
+        """Test that historical cache expires when the bar closes."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ohlcv
+            
+            await server.get_historical_price("BTC/USDT", "1m", 3)
+            assert mock_fetch.call_count == 1
+            
+            # Manually expire the cache
+            ohlcv_cache[("BTC/USDT", "1m", 3)]["expires"] -= 61
+            
+            await server.get_historical_price("BTC/USDT", "1m", 3)
+            assert mock_fetch.call_count == 2
     
     @pytest.mark.asyncio
     async def test_network_error(self, server):
@@ -233,6 +495,16 @@ class TestGetHistoricalPrice:
             
             assert "Network error" in result
             assert "failed" in result.lower()
+    
+    @pytest.mark.asyncio
+    async def test_unexpected_error(self, server):
+        """Test handling of unexpected errors."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = ValueError("bad candle")
+            
+            result = await server.get_historical_price("BTC/USDT")
+            
+            assert result == "Unexpected error fetching historical data for BTC/USDT: bad candle"
 
 
 class TestCacheManagement:
@@ -254,6 +526,257 @@ class TestCacheManagement:
             assert mock_fetch.call_count == 2
             assert "BTC/USDT" in price_cache
             assert "ETH/USDT" in price_cache
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, server, mock_ticker):
+        """Test that the least recently used entry is evicted beyond the limit."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch, \
+                patch("main.MAX_CACHE_ENTRIES", 2):
+            mock_fetch.return_value = mock_ticker
+            
+            await server.get_current_price("BTC/USDT")
+            await server.get_current_price("ETH/USDT")
+            
+            # Cache hit marks BTC as most recently used
+            await server.get_current_price("BTC/USDT")
+            await server.get_current_price("SOL/USDT")
+            
+            assert list(price_cache) == ["BTC/USDT", "SOL/USDT"]
+            assert mock_fetch.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesced(self, server, mock_ticker):
+        """Test that concurrent cache misses for a symbol share one API call."""
+        async def slow_fetch(symbol):
+            await asyncio.sleep(0.01)
+            return mock_ticker
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = slow_fetch
+            
+            results = await asyncio.gather(*[server.get_current_price("BTC/USDT") for _ in range(5)])
+            
+            assert mock_fetch.call_count == 1
+            assert len(set(results)) == 1
+            assert not server._inflight_ticker
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, server, mock_ticker):
+        """Test that cancelling the first caller leaves joined callers unaffected."""
+        release = asyncio.Event()
+        
+        async def slow_fetch(symbol):
+            await release.wait()
+            return mock_ticker
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = slow_fetch
+            
+            first = asyncio.create_task(server.get_current_price("BTC/USDT"))
+            second = asyncio.create_task(server.get_current_price("BTC/USDT"))
+            await asyncio.sleep(0)
+            
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            
+            result = await second
+            assert "45000" in result
+            assert first.cancelled()
+            assert mock_fetch.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_historical_requests_coalesced(self, server, mock_ohlcv):
+        """Test that concurrent historical cache misses share one API call."""
+        async def slow_fetch(**kwargs):
+            await asyncio.sleep(0.01)
+            return mock_ohlcv
+        
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.side_effect = slow_fetch
+            
+            results = await asyncio.gather(*[server.get_historical_price("BTC/USDT", "1h", 3) for _ in range(5)])
+            
+            assert mock_fetch.call_count == 1
+            assert len(set(results)) == 1
+            assert not server._inflight_ohlcv
+
+
+class TestToolHandlers:
+    """Tests for the MCP request handlers."""
+    
+    @pytest.mark.asyncio
+    async def test_list_tools(self, server):
+        """Test that list_tools returns the prebuilt tool descriptors."""
+        handler = server.server.request_handlers[types.ListToolsRequest]
+        
+        result1 = await handler(types.ListToolsRequest(method="tools/list"))
+        result2 = await handler(types.ListToolsRequest(method="tools/list"))
+        
+        names = [tool.name for tool in result1.root.tools]
+        assert names == ["get_current_price", "get_current_prices", "get_historical_price"]
+        assert result1.root.tools[0] is result2.root.tools[0]
+    
+    @staticmethod
+    async def _call(server, name, arguments):
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name=name, arguments=arguments)
+        )
+        result = await handler(request)
+        return result.root.content[0].text
+    
+    @pytest.mark.asyncio
+    async def test_call_tool_dispatch(self, server, mock_ohlcv):
+        """Test that call_tool routes to the named tool with defaults applied."""
+        with patch.object(server.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ohlcv
+            
+            text = await self._call(server, "get_historical_price", {"symbol": "BTC/USDT"})
+            
+            assert "candles" in text
+            mock_fetch.assert_called_once_with(symbol="BTC/USDT", timeframe="1h", limit=10)
+    
+    @pytest.mark.asyncio
+    async def test_call_cached_price(self, server, mock_ticker):
+        """Test that cache hits return the cached TextContent by reference."""
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_ticker
+            
+            content1 = await server._call_current_price({"symbol": "BTC/USDT"})
+            content2 = await server._call_current_price({"symbol": "btc/usdt"})
+            
+            assert mock_fetch.call_count == 1
+            assert content2[0] is price_cache["BTC/USDT"]["response"]
+            assert content1[0].text == content2[0].text
+    
+    @pytest.mark.asyncio
+    async def test_call_unknown_tool(self, server):
+        """Test that unknown tool names return an error message."""
+        text = await self._call(server, "get_volume", {})
+        
+        assert "Unknown tool: get_volume" in text
+
+
+class TestTickerStreams:
+    """Tests for WebSocket ticker streaming."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_updates_cache(self, mock_ticker):
+        """Test that a fetched symbol is kept fresh by its ticker stream."""
+        server = CryptoMCPServer()
+        updated = asyncio.Event()
+        blocked = asyncio.Event()
+        
+        async def watch(symbol):
+            if updated.is_set():
+                await blocked.wait()
+            updated.set()
+            return {**mock_ticker, "last": 46000.00}
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch, \
+                patch.object(server.exchange, 'watch_ticker', side_effect=watch), \
+                patch.object(server.exchange, 'close', new_callable=AsyncMock):
+            mock_fetch.return_value = mock_ticker
+            
+            result1 = await server.get_current_price("BTC/USDT")
+            assert "45000" in result1
+            assert "BTC/USDT" in server._ticker_streams
+            
+            await updated.wait()
+            result2 = await server.get_current_price("BTC/USDT")
+            assert "46000" in result2
+            assert mock_fetch.call_count == 1
+            
+            await server.cleanup()
+            assert not server._ticker_streams
+    
+    @staticmethod
+    def _watch(ticker):
+        async def watch(symbol):
+            await asyncio.sleep(0)
+            return ticker
+        return watch
+    
+    @pytest.mark.asyncio
+    async def test_idle_stream_stops(self, mock_ticker):
+        """Test that a stream stops once its symbol goes unread."""
+        server = CryptoMCPServer()
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch, \
+                patch.object(server.exchange, 'watch_ticker', side_effect=self._watch(mock_ticker)), \
+                patch.object(server.exchange, 'un_watch_ticker', new_callable=AsyncMock) as mock_unwatch:
+            mock_fetch.return_value = mock_ticker
+            
+            await server.get_current_price("BTC/USDT")
+            await server.get_current_price("BTC/USDT")
+            assert "BTC/USDT" in server._ticker_streams
+            
+            # No reads for longer than the stale window
+            server._stream_last_read["BTC/USDT"] -= 121
+            await asyncio.gather(*server._ticker_streams.values())
+            
+            mock_unwatch.assert_called_once_with("BTC/USDT")
+            assert not server._ticker_streams
+            assert not server._stream_last_read
+    
+    @pytest.mark.asyncio
+    async def test_evicted_stream_stops(self, mock_ticker):
+        """Test that a stream stops once its cache entry is evicted."""
+        server = CryptoMCPServer()
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch, \
+                patch.object(server.exchange, 'watch_ticker', side_effect=self._watch(mock_ticker)), \
+                patch.object(server.exchange, 'un_watch_ticker', new_callable=AsyncMock) as mock_unwatch:
+            mock_fetch.return_value = mock_ticker
+            
+            await server.get_current_price("BTC/USDT")
+            price_cache.clear()
+            await asyncio.gather(*server._ticker_streams.values())
+            
+            mock_unwatch.assert_called_once_with("BTC/USDT")
+            assert not server._ticker_streams
+    
+    @pytest.mark.asyncio
+    async def test_stream_failure_falls_back_to_rest(self, mock_ticker):
+        """Test that a failed stream is dropped so REST fetches resume."""
+        server = CryptoMCPServer()
+        
+        with patch.object(server.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch, \
+                patch.object(server.exchange, 'watch_ticker', new_callable=AsyncMock) as mock_watch:
+            mock_fetch.return_value = mock_ticker
+            mock_watch.side_effect = ccxt.NetworkError("Connection closed")
+            
+            await server.get_current_price("BTC/USDT")
+            await asyncio.gather(*server._ticker_streams.values())
+            
+            mock_watch.assert_called_once_with("BTC/USDT")
+            assert not server._ticker_streams
+
+
+class TestMarketPreload:
+    """Tests for loading markets at startup."""
+    
+    @pytest.mark.asyncio
+    async def test_load_markets(self, server):
+        """Test that markets are loaded through the exchange."""
+        with patch.object(server.exchange, 'load_markets', new_callable=AsyncMock) as mock_load:
+            server.exchange.markets = {"BTC/USDT": {}}
+            
+            await server._load_markets()
+            
+            mock_load.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_load_markets_failure(self, server):
+        """Test that a failed preload does not prevent the server from starting."""
+        with patch.object(server.exchange, 'load_markets', new_callable=AsyncMock) as mock_load:
+            mock_load.side_effect = ccxt.NetworkError("Connection refused")
+            
+            await server._load_markets()
+            
+            assert server.exchange.markets is None
 
 
 class TestServerCleanup:
@@ -265,6 +788,22 @@ class TestServerCleanup:
         with patch.object(server.exchange, 'close', new_callable=AsyncMock) as mock_close:
             await server.cleanup()
             mock_close.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_pooled_session(self, server):
+        """Test that the exchange shares the pooled session and cleanup closes it."""
+        server._open_session()
+        session = server._session
+        
+        assert server.exchange.session is session
+        assert session.connector.limit == 100
+        assert session.connector.limit_per_host == 20
+        assert server.exchange.ssl_context is not None
+        assert session.connector._ssl is server.exchange.ssl_context
+        
+        await server.cleanup()
+        assert session.closed
+        assert server._session is None
 
 
 if __name__ == "__main__":